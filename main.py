@@ -1,27 +1,14 @@
+import heapq
 import os
 from datetime import datetime
 
 from utils.file_handler import (
     read_sales_data,
     parse_transactions,
-    validate_and_filter
+    validate_transactions,
+    apply_filters
 )
-from utils.data_processor import (
-    calculate_total_revenue,
-    region_wise_sales,
-    top_selling_products,
-    customer_analysis,
-    SalesDateAnalyzer,
-    low_performing_products
-)
-from utils.api_handler import (
-    fetch_all_products,
-    create_product_mapping,
-    enrich_sales_data,
-    save_enriched_data
-)
-
-from datetime import datetime
+from utils.data_processor import compute_all_analytics
 
 
 def generate_sales_report(
@@ -50,187 +37,198 @@ def generate_sales_report(
             if total_transactions else 0
         )
 
-        dates = [txn["Date"] for txn in valid_transactions]
+        # Daily trend already holds one entry per distinct date
         date_range = (
-            min(dates), max(dates)
-        ) if dates else ("N/A", "N/A")
+            min(daily_trend), max(daily_trend)
+        ) if daily_trend else ("N/A", "N/A")
+
+        # API enrichment summary (matches and failures in one pass)
+        enriched_count = 0
+        failed_products = set()
+
+        for t in enriched_transactions:
+            if t.get("API_Match"):
+                enriched_count += 1
+            else:
+                failed_products.add(t["ProductName"])
+
+        failed_products = sorted(failed_products)
 
-        # API enrichment summary
-        enriched_count = sum(
-            1 for t in enriched_transactions if t.get("API_Match")
-        )
         enrichment_rate = (
             enriched_count / total_transactions * 100
             if total_transactions else 0
         )
 
-        failed_products = sorted({
-            t["ProductName"]
-            for t in enriched_transactions
-            if not t.get("API_Match")
-        })
-
-        # Average transaction value per region
-        avg_value_per_region = {
-            region: (
-                data["total_sales"] / data["transaction_count"]
-                if data["transaction_count"] else 0
-            )
-            for region, data in region_sales.items()
-        }
-
         # -----------------------------
-        # WRITE REPORT
+        # BUILD REPORT (written in a single call)
+        # Table rows are formatted by generators fed to parts.extend
         # -----------------------------
-        with open(output_file, "w", encoding="utf-8") as f:
+        parts = []
+        append = parts.append
+
+        # HEADER
+        append("=" * 44 + "\n")
+        append("           SALES ANALYTICS REPORT\n")
+        append(
+            f"     Generated: "
+            f"{datetime.now():%Y-%m-%d %H:%M:%S}\n"
+        )
+        append(f"     Records Processed: {total_transactions}\n")
+        append("=" * 44 + "\n\n")
+
+        # OVERALL SUMMARY
+        append("OVERALL SUMMARY\n")
+        append("-" * 44 + "\n")
+        append(f"Total Revenue:        ₹{total_revenue:,.2f}\n")
+        append(f"Total Transactions:   {total_transactions}\n")
+        append(f"Average Order Value:  ₹{avg_order_value:,.2f}\n")
+        append(
+            f"Date Range:           "
+            f"{date_range[0]} to {date_range[1]}\n\n"
+        )
 
-            # HEADER
-            f.write("=" * 44 + "\n")
-            f.write("           SALES ANALYTICS REPORT\n")
-            f.write(
-                f"     Generated: "
-                f"{datetime.now():%Y-%m-%d %H:%M:%S}\n"
-            )
-            f.write(f"     Records Processed: {total_transactions}\n")
-            f.write("=" * 44 + "\n\n")
-
-            # OVERALL SUMMARY
-            f.write("OVERALL SUMMARY\n")
-            f.write("-" * 44 + "\n")
-            f.write(f"Total Revenue:        ₹{total_revenue:,.2f}\n")
-            f.write(f"Total Transactions:   {total_transactions}\n")
-            f.write(f"Average Order Value:  ₹{avg_order_value:,.2f}\n")
-            f.write(
-                f"Date Range:           "
-                f"{date_range[0]} to {date_range[1]}\n\n"
-            )
+        # REGION-WISE PERFORMANCE
+        append("REGION-WISE PERFORMANCE\n")
+        append("-" * 44 + "\n")
+        append(
+            f"{'Region':<10}"
+            f"{'Sales':<15}"
+            f"{'% of Total':<12}"
+            f"Transactions\n"
+        )
 
-            # REGION-WISE PERFORMANCE
-            f.write("REGION-WISE PERFORMANCE\n")
-            f.write("-" * 44 + "\n")
-            f.write(
-                f"{'Region':<10}"
-                f"{'Sales':<15}"
-                f"{'% of Total':<12}"
-                f"Transactions\n"
-            )
+        # Average transaction value per region is formatted in the same
+        # pass and emitted later in the product performance section
+        region_avg_lines = []
 
-            for region, data in region_sales.items():
-                f.write(
-                    f"{region:<10}"
-                    f"₹{data['total_sales']:>12,.2f}  "
-                    f"{data['percentage']:>8.2f}%    "
-                    f"{data['transaction_count']}\n"
-                )
-            f.write("\n")
-
-            # TOP PRODUCTS
-            f.write("TOP 5 PRODUCTS\n")
-            f.write("-" * 44 + "\n")
-            f.write(
-                f"{'Rank':<6}"
-                f"{'Product Name':<25}"
-                f"{'Qty':<6}"
-                f"Revenue\n"
+        for region, data in region_sales.items():
+            total_sales = data["total_sales"]
+            txn_count = data["transaction_count"]
+
+            append(
+                f"{region:<10}"
+                f"₹{total_sales:>12,.2f}  "
+                f"{data['percentage']:>8.2f}%    "
+                f"{txn_count}\n"
             )
 
+            avg_value = total_sales / txn_count if txn_count else 0
+            region_avg_lines.append(f"- {region}: ₹{avg_value:,.2f}\n")
+        append("\n")
+
+        # TOP PRODUCTS
+        append("TOP 5 PRODUCTS\n")
+        append("-" * 44 + "\n")
+        append(
+            f"{'Rank':<6}"
+            f"{'Product Name':<25}"
+            f"{'Qty':<6}"
+            f"Revenue\n"
+        )
+
+        parts.extend(
+            f"{idx:<6}"
+            f"{name:<25}"
+            f"{qty:<6}"
+            f"₹{revenue:,.2f}\n"
             for idx, (name, qty, revenue) in enumerate(
                 top_products[:5], start=1
-            ):
-                f.write(
-                    f"{idx:<6}"
-                    f"{name:<25}"
-                    f"{qty:<6}"
-                    f"₹{revenue:,.2f}\n"
-                )
-            f.write("\n")
-
-            # TOP CUSTOMERS
-            top_customers = sorted(
-                customer_stats.items(),
-                key=lambda x: x[1].get("total_spent", 0),
-                reverse=True
-            )[:5]
-
-            f.write("TOP 5 CUSTOMERS\n")
-            f.write("-" * 44 + "\n")
-            f.write(
-                f"{'Rank':<6}"
-                f"{'Customer ID':<15}"
-                f"{'Spent':<15}"
-                f"Orders\n"
             )
+        )
+        append("\n")
 
-            for rank, (cust_id, data) in enumerate(top_customers, start=1):
-                f.write(
-                    f"{rank:<6}"
-                    f"{cust_id:<15}"
-                    f"₹{data['total_spent']:>12,.2f}  "
-                    f"{data['purchase_count']}\n"
-                )
-            f.write("\n")
-
-            # DAILY SALES TREND
-            f.write("DAILY SALES TREND\n")
-            f.write("-" * 44 + "\n")
-            f.write(
-                f"{'Date':<12}"
-                f"{'Revenue':<15}"
-                f"{'Txn':<6}"
-                f"Customers\n"
-            )
+        # TOP CUSTOMERS
+        top_customers = heapq.nlargest(
+            5,
+            customer_stats.items(),
+            key=lambda x: x[1].get("total_spent", 0)
+        )
 
-            for date, data in daily_trend.items():
-                f.write(
-                    f"{date:<12}"
-                    f"₹{data['revenue']:>12,.2f}  "
-                    f"{data['transaction_count']:<6}"
-                    f"{data['unique_customers']}\n"
-                )
-            f.write("\n")
-
-            # PRODUCT PERFORMANCE
-            f.write("PRODUCT PERFORMANCE ANALYSIS\n")
-            f.write("-" * 44 + "\n")
-            peak_date, peak_revenue, peak_txn = peak_sales_day
-            f.write(
-                f"Best Selling Day: {peak_date} "
-                f"(₹{peak_revenue:,.2f}, "
-                f"{peak_txn} transactions)\n\n"
+        append("TOP 5 CUSTOMERS\n")
+        append("-" * 44 + "\n")
+        append(
+            f"{'Rank':<6}"
+            f"{'Customer ID':<15}"
+            f"{'Spent':<15}"
+            f"Orders\n"
+        )
+
+        parts.extend(
+            f"{rank:<6}"
+            f"{cust_id:<15}"
+            f"₹{data['total_spent']:>12,.2f}  "
+            f"{data['purchase_count']}\n"
+            for rank, (cust_id, data) in enumerate(top_customers, start=1)
+        )
+        append("\n")
+
+        # DAILY SALES TREND
+        append("DAILY SALES TREND\n")
+        append("-" * 44 + "\n")
+        append(
+            f"{'Date':<12}"
+            f"{'Revenue':<15}"
+            f"{'Txn':<6}"
+            f"Customers\n"
+        )
+
+        parts.extend(
+            f"{date:<12}"
+            f"₹{data['revenue']:>12,.2f}  "
+            f"{data['transaction_count']:<6}"
+            f"{data['unique_customers']}\n"
+            for date, data in daily_trend.items()
+        )
+        append("\n")
+
+        # PRODUCT PERFORMANCE
+        append("PRODUCT PERFORMANCE ANALYSIS\n")
+        append("-" * 44 + "\n")
+        peak_date, peak_revenue, peak_txn = peak_sales_day
+        append(
+            f"Best Selling Day: {peak_date} "
+            f"(₹{peak_revenue:,.2f}, "
+            f"{peak_txn} transactions)\n\n"
+        )
+
+        if low_products:
+            append("Low Performing Products:\n")
+            parts.extend(
+                f"- {name}: "
+                f"{qty} units, "
+                f"₹{revenue:,.2f}\n"
+                for name, qty, revenue in low_products
             )
+        else:
+            append("No low performing products identified.\n")
 
-            if low_products:
-                f.write("Low Performing Products:\n")
-                for name, qty, revenue in low_products:
-                    f.write(
-                        f"- {name}: "
-                        f"{qty} units, "
-                        f"₹{revenue:,.2f}\n"
-                    )
-            else:
-                f.write("No low performing products identified.\n")
+        append("\nAverage Transaction Value per Region:\n")
+        parts.extend(region_avg_lines)
 
-            f.write("\nAverage Transaction Value per Region:\n")
-            for region, value in avg_value_per_region.items():
-                f.write(f"- {region}: ₹{value:,.2f}\n")
+        append("\n")
 
-            f.write("\n")
+        # API ENRICHMENT
+        append("API ENRICHMENT SUMMARY\n")
+        append("-" * 44 + "\n")
+        append(
+            f"Total Enriched Records: "
+            f"{enriched_count}/{total_transactions}\n"
+        )
+        append(f"Success Rate: {enrichment_rate:.2f}%\n")
 
-            # API ENRICHMENT
-            f.write("API ENRICHMENT SUMMARY\n")
-            f.write("-" * 44 + "\n")
-            f.write(
-                f"Total Enriched Records: "
-                f"{enriched_count}/{total_transactions}\n"
-            )
-            f.write(f"Success Rate: {enrichment_rate:.2f}%\n")
+        if failed_products:
+            append("Products not enriched:\n")
+            parts.extend(f"- {product}\n" for product in failed_products)
+        else:
+            append("All products enriched successfully.\n")
 
-            if failed_products:
-                f.write("Products not enriched:\n")
-                for product in failed_products:
-                    f.write(f"- {product}\n")
-            else:
-                f.write("All products enriched successfully.\n")
+        # -----------------------------
+        # WRITE REPORT
+        # -----------------------------
+        os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write("".join(parts))
 
         print(f"✓ Report saved to: {output_file}\n")
 
@@ -264,13 +262,26 @@ def main():
         # Step 2: Parse and clean transactions
         print("[2/10] Parsing and cleaning data...")
         transactions = parse_transactions(raw_lines)
+        del raw_lines  # raw text is no longer needed once parsed
         print(f"✓ Parsed {len(transactions)} records\n")
 
         # Step 3: Display filter options
         print("[3/10] Filter Options Available:")
 
-        # Preview validation to show regions and amount range
-        _valid_preview, _invalid_preview, _ = validate_and_filter(transactions)
+        # Validate once up front, then show regions and amount range
+        valid_transactions, invalid_count, validation_info = (
+            validate_transactions(transactions)
+        )
+
+        if validation_info["available_regions"]:
+            print(f"Available Regions: {validation_info['available_regions']}")
+
+        if validation_info["amount_range"]:
+            lowest_amount, highest_amount = validation_info["amount_range"]
+            print(
+                f"Transaction Amount Range: "
+                f"{lowest_amount} to {highest_amount}"
+            )
 
         print()
         choice = input("Do you want to filter data? (y/n): ").strip().lower()
@@ -295,15 +306,21 @@ def main():
                 min_amount = None
                 max_amount = None
 
-        # Step 4: Validate and apply filters
+        # Step 4: Apply filters to the already validated transactions
         print("[4/10] Validating transactions...")
-        valid_transactions, invalid_count, summary = validate_and_filter(
-            transactions,
+        valid_transactions, filter_counts = apply_filters(
+            valid_transactions,
             region=region,
             min_amount=min_amount,
             max_amount=max_amount
         )
 
+        summary = {
+            "total_input": len(transactions),
+            "invalid": invalid_count,
+            **filter_counts
+        }
+
         print("✓ Validation Summary")
         print(f"  Total input records        : {summary['total_input']}")
         print(f"  Invalid records (cleaning): {summary['invalid']}")
@@ -317,30 +334,40 @@ def main():
         # Step 5: Perform all data analyses (Part 2)
         print("[5/10] Analyzing sales data...")
 
-        total_revenue = calculate_total_revenue(valid_transactions)
+        # All analyses share a single pass over the transactions
+        analytics = compute_all_analytics(valid_transactions)
+
+        total_revenue = analytics["total_revenue"]
         print(f"✓ Total Revenue Calculated...")
 
-        region_sales = region_wise_sales(valid_transactions)
+        region_sales = analytics["region_sales"]
         print("✓ Region-wise sales analysis complete...")
 
-        top_products = top_selling_products(valid_transactions)
+        top_products = analytics["top_products"]
         print("✓ Top selling products identified...")
 
-        customer_stats = customer_analysis(valid_transactions)
+        customer_stats = analytics["customer_stats"]
         print("✓ Customer purchase analysis complete...")
 
-        analyzer = SalesDateAnalyzer(valid_transactions)
-        daily_trend = analyzer.daily_sales_trend()
+        daily_trend = analytics["daily_trend"]
         print("✓ Daily sales trend calculated...")
 
-        peak_date, peak_revenue, peak_count = analyzer.find_peak_sales_day()
+        peak_date, peak_revenue, peak_count = analytics["peak_sales_day"]
         print("✓ Peak sales day identified...")
 
-        low_products = low_performing_products(valid_transactions)
+        low_products = analytics["low_products"]
         print("✓ Low performing products identified...\n")
 
         
         # STEP 6: Fetch products from API
+        # (API dependencies are only imported once validation has passed)
+        from utils.api_handler import (
+            fetch_all_products,
+            create_product_mapping,
+            enrich_sales_data,
+            save_enriched_data
+        )
+
         print("[6/10] Fetching product data from API...")
         api_products = fetch_all_products()
 
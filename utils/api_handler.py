@@ -1,40 +1,193 @@
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+try:
+    import orjson   # optional, faster JSON decoder
+except ImportError:
+    orjson = None
 
-def fetch_all_products():
+
+PRODUCTS_URL = "https://dummyjson.com/products"
+PAGE_SIZE = 100     # maximum allowed products in one call
+MAX_WORKERS = 8     # concurrent page requests
+CACHE_FILE = "data/.product_cache.json"
+
+_DIGIT_RE = re.compile(r"(\d+)")
+
+# Decoder for API response bodies (bytes); orjson when installed
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _create_session():
     """
-    Fetches all products from DummyJSON API
+    Creates a requests Session with connection pooling and retries
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=MAX_WORKERS,
+        pool_maxsize=MAX_WORKERS,
+        max_retries=Retry(total=3, backoff_factor=0.3)
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
-    Returns: list of product dictionaries
+
+# Shared session so every page request reuses the same TCP/TLS connections
+_SESSION = _create_session()
+
+
+def _load_cache(filename=CACHE_FILE):
+    """
+    Loads cached API pages (with their validators) from disk
+
+    Returns: dictionary keyed by request URL
+    """
+    try:
+        with open(filename, "r", encoding="utf-8") as file:
+            cache = json.load(file)
+
+    except (OSError, ValueError):
+        # Missing or corrupt cache → start fresh
+        return {}
+
+    # Anything other than a dict (e.g. null or []) is not a usable cache
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_cache(cache, filename=CACHE_FILE):
+    """
+    Saves cached API pages to disk
+    """
+    try:
+        with open(filename, "w", encoding="utf-8") as file:
+            json.dump(cache, file)
+
+    except OSError:
+        # The cache is only an optimisation; never fail the run over it
+        pass
+
+
+def _is_usable_entry(entry):
+    """
+    Checks that a cached entry holds a page body shaped like an API response
+    """
+    if not isinstance(entry, dict):
+        return False
+
+    body = entry.get("body")
+    return isinstance(body, dict) and isinstance(body.get("products"), list)
+
+
+def _fetch_page(skip, cache):
+    """
+    Fetches one page of products starting at the given offset
+
+    Sends a conditional request when the page is cached, and reuses the
+    cached body if the server answers 304 Not Modified.
+
+    Returns: decoded JSON response (dictionary)
     """
-    url = "https://dummyjson.com/products"
     params = {
-        "limit": 100   # fetch maximum allowed products in one call
+        "limit": PAGE_SIZE,
+        "skip": skip
     }
+    cache_key = f"{PRODUCTS_URL}?limit={PAGE_SIZE}&skip={skip}"
+
+    cached = cache.get(cache_key)
+    if not _is_usable_entry(cached):
+        # Malformed entries are a cache miss, so a 304 always has a page body
+        cached = None
+    headers = {}
+
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    response = _SESSION.get(
+        PRODUCTS_URL, params=params, headers=headers, timeout=10
+    )
+
+    if response.status_code == 304 and cached:
+        return cached["body"]
+
+    response.raise_for_status()  # raises HTTPError for 4xx/5xx
+
+    data = _json_loads(response.content)
+
+    if not (
+        isinstance(data, dict)
+        and isinstance(data.get("products", []), list)
+    ):
+        # Handled like an undecodable body: the whole fetch fails cleanly
+        raise ValueError(f"Unexpected product page format (skip={skip})")
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+
+    if etag or last_modified:
+        cache[cache_key] = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": data
+        }
 
-    try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()  # raises HTTPError for 4xx/5xx
+    return data
 
-        data = response.json()
-        products = data.get("products", [])
 
-        cleaned_products = []
+def fetch_all_products():
+    """
+    Fetches all products from DummyJSON API
+
+    Returns: list of product dictionaries
+    """
+    cache = _load_cache()
+    fetch_page = partial(_fetch_page, cache=cache)
 
-        for product in products:
-            cleaned_products.append({
+    try:
+        # First page also tells us how many products exist in total
+        first_page = fetch_page(0)
+        products = list(first_page.get("products", []))
+        total = first_page.get("total", len(products))
+
+        if not isinstance(total, int):
+            # Unusable total → keep just the first page
+            total = len(products)
+
+        # Fetch any remaining pages concurrently
+        remaining_skips = range(PAGE_SIZE, total, PAGE_SIZE)
+        if remaining_skips:
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                for page in executor.map(fetch_page, remaining_skips):
+                    products.extend(page.get("products", []))
+
+        _save_cache(cache)
+
+        cleaned_products = [
+            {
                 "id": product.get("id"),
                 "title": product.get("title"),
                 "category": product.get("category"),
                 "brand": product.get("brand", "N/A"),  # brand may be missing
                 "price": product.get("price"),
                 "rating": product.get("rating")
-            })
+            }
+            for product in products
+        ]
 
         print(f"✓ Successfully fetched {len(cleaned_products)} products\n")
         return cleaned_products
 
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, ValueError) as e:
+        # ValueError covers json/orjson decode errors on a non-JSON body
         print("❌ Failed to fetch products from API")
         print(f"Reason: {e}")
         return []
@@ -66,40 +219,66 @@ def create_product_mapping(api_products):
 
     return product_mapping
 
-def enrich_sales_data(transactions, product_mapping):
+_UNMATCHED_FIELDS = {
+    "API_Category": None,
+    "API_Brand": None,
+    "API_Rating": None,
+    "API_Match": False
+}
+
+
+def _resolve_api_fields(product_id_str, product_mapping):
     """
-    Enriches transaction data with API product information
+    Resolves a ProductID (e.g. 'P101') to its API enrichment fields
+
+    Returns: dictionary of API_* fields
     """
-    enriched_transactions = []
+    try:
+        # Extract numeric part: P101 -> 101
+        if product_id_str[:1] in ("P", "p") and product_id_str[1:].isdigit():
+            # Fast path for the common 'P<digits>' format
+            numeric_id = int(product_id_str[1:])
+        else:
+            match = _DIGIT_RE.search(product_id_str)
+            if match is None:
+                raise ValueError(f"No numeric part in {product_id_str!r}")
+            numeric_id = int(match.group(1))
 
-    for txn in transactions:
-        enriched_txn = txn.copy()
+        api_product = product_mapping.get(numeric_id)
 
-        # Default enrichment values
-        enriched_txn["API_Category"] = None
-        enriched_txn["API_Brand"] = None
-        enriched_txn["API_Rating"] = None
-        enriched_txn["API_Match"] = False
+        if api_product:
+            return {
+                "API_Category": api_product.get("category"),
+                "API_Brand": api_product.get("brand"),
+                "API_Rating": api_product.get("rating"),
+                "API_Match": True
+            }
 
-        try:
-            product_id_str = txn.get("ProductID", "")
+    except Exception:
+        # Any parsing / mapping issue → enrichment fails gracefully
+        pass
 
-            # Extract numeric part: P101 -> 101
-            numeric_id = int("".join(filter(str.isdigit, product_id_str)))
+    return _UNMATCHED_FIELDS
 
-            api_product = product_mapping.get(numeric_id)
 
-            if api_product:
-                enriched_txn["API_Category"] = api_product.get("category")
-                enriched_txn["API_Brand"] = api_product.get("brand")
-                enriched_txn["API_Rating"] = api_product.get("rating")
-                enriched_txn["API_Match"] = True
+def enrich_sales_data(transactions, product_mapping):
+    """
+    Enriches transaction data with API product information
+    """
+    enriched_transactions = []
 
-        except Exception:
-            # Any parsing / mapping issue → enrichment fails gracefully
-            enriched_txn["API_Match"] = False
+    # Each distinct ProductID is parsed and looked up only once
+    resolved_fields = {}
+
+    for txn in transactions:
+        product_id_str = txn.get("ProductID", "")
 
-        enriched_transactions.append(enriched_txn)
+        api_fields = resolved_fields.get(product_id_str)
+        if api_fields is None:
+            api_fields = _resolve_api_fields(product_id_str, product_mapping)
+            resolved_fields[product_id_str] = api_fields
+
+        enriched_transactions.append({**txn, **api_fields})
 
     return enriched_transactions
 
@@ -115,7 +294,8 @@ def save_enriched_data(enriched_transactions, filename="data/enriched_sales_data
     ]
 
     try:
-        with open(filename, "w", encoding="utf-8") as file:
+        # A 1 MiB buffer batches the per-row writes into a few large writes
+        with open(filename, "w", encoding="utf-8", buffering=1 << 20) as file:
             # Write header
             file.write("|".join(header) + "\n")
 
@@ -142,4 +322,3 @@ def save_enriched_data(enriched_transactions, filename="data/enriched_sales_data
     except Exception as e:
         print("❌ Failed to save enriched data")
         print(f"Reason: {e}")
-
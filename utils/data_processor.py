@@ -1,3 +1,7 @@
+import heapq
+from collections import defaultdict
+from functools import cached_property
+
 # Task 2.1: Sales summaary Calculator
 
 def calculate_total_revenue(transactions):
@@ -28,44 +32,22 @@ def region_wise_sales(transactions):
 
     Returns: dictionary with region statistics
     """
-    from utils.data_processor import calculate_total_revenue
-
-    region_groups = {}
+    region_totals = defaultdict(lambda: [0.0, 0])  # revenue, count
+    total_revenue = 0.0
 
-    # Group transactions by region
+    # Accumulate every region's revenue and count in one pass
     for txn in transactions:
-        region = txn["Region"]
-        region_groups.setdefault(region, []).append(txn)
-
-    # Calculate overall revenue once
-    total_revenue_overall = calculate_total_revenue(transactions)
-
-    region_stats = {}
-
-    for region, txns in region_groups.items():
-        region_revenue = calculate_total_revenue(txns)
-
-        percentage = (
-            (region_revenue / total_revenue_overall) * 100
-            if total_revenue_overall > 0 else 0.0
-        )
+        amount = txn.get("TransactionAmount")  # set by validation
+        if amount is None:
+            amount = txn["Quantity"] * txn["UnitPrice"]
 
-        region_stats[region] = {
-            "total_sales": round(region_revenue, 2),
-            "transaction_count": len(txns),
-            "percentage": round(percentage, 2)
-        }
+        region = region_totals[txn["Region"]]
+        region[0] += amount
+        region[1] += 1
 
-    # Sort by total_sales descending
-    sorted_region_stats = dict(
-        sorted(
-            region_stats.items(),
-            key=lambda item: item[1]["total_sales"],
-            reverse=True
-        )
-    )
+        total_revenue += amount
 
-    return sorted_region_stats
+    return _region_stats(region_totals, round(total_revenue, 2))
 
 def top_selling_products(transactions, n=5):
     """
@@ -73,59 +55,23 @@ def top_selling_products(transactions, n=5):
 
     Returns: list of tuples
     """
-
-    product_summary = {}
-
-    for txn in transactions:
-        product = txn["ProductName"]
-        qty = txn["Quantity"]
-        amount = qty * txn["UnitPrice"]
-
-        summary = product_summary.setdefault(
-            product, {"total_quantity": 0, "total_revenue": 0.0}
-        )
-
-        summary["total_quantity"] += qty
-        summary["total_revenue"] += amount
-
-    return sorted(
-        [
-            (product, data["total_quantity"], round(data["total_revenue"], 2))
-            for product, data in product_summary.items()
-        ],
-        key=lambda x: x[1],
-        reverse=True
-    )[:n]
+    return _top_products(_product_totals(transactions), n)
 
 def customer_analysis(transactions):
-    customer_stats = {}
+    customer_totals = defaultdict(lambda: [0.0, 0, set()])  # spent, count, products
 
+    # One lookup per row updates all three per-customer accumulators
     for txn in transactions:
-        cust = txn["CustomerID"]
-        amount = txn["Quantity"] * txn["UnitPrice"]
-
-        stats = customer_stats.setdefault(
-            cust,
-            {
-                "total_spent": 0.0,
-                "purchase_count": 0,
-                "products_bought": set()
-            }
-        )
+        amount = txn.get("TransactionAmount")  # set by validation
+        if amount is None:
+            amount = txn["Quantity"] * txn["UnitPrice"]
 
-        stats["total_spent"] += amount
-        stats["purchase_count"] += 1
-        stats["products_bought"].add(txn["ProductName"])
+        customer = customer_totals[txn["CustomerID"]]
+        customer[0] += amount
+        customer[1] += 1
+        customer[2].add(txn["ProductName"])
 
-    # Final formatting
-    for cust, data in customer_stats.items():
-        data["total_spent"] = round(data["total_spent"], 2)
-        data["avg_order_value"] = round(
-            data["total_spent"] / data["purchase_count"], 2
-        )
-        data["products_bought"] = sorted(data["products_bought"])
-
-    return customer_stats
+    return _customer_stats(customer_totals)
 
 # Task 2.2: Date-based Analysis
 
@@ -136,38 +82,43 @@ class SalesDateAnalyzer:
 
     def __init__(self, transactions):
         self.transactions = transactions
-        self._daily_data = None
 
-    def _aggregate_by_date(self):
+    @cached_property
+    def _daily_data(self):
         """
-        Analyzes sales trends by date
+        Aggregates revenue, transaction count and customers per date
 
-        Returns: dictionary sorted by date
-        """
-        if self._daily_data is not None:
-            return self._daily_data
+        Built once on first access and shared by all analysis methods
 
-        daily_stats = {}
+        Returns: dictionary mapping date to [revenue, count, customers]
+        """
+        daily_totals = defaultdict(lambda: [0.0, 0, set()])
 
         for txn in self.transactions:
-            date = txn["Date"]
-            amount = txn["Quantity"] * txn["UnitPrice"]
+            amount = txn.get("TransactionAmount")  # set by validation
+            if amount is None:
+                amount = txn["Quantity"] * txn["UnitPrice"]
 
-            stats = daily_stats.setdefault(
-                date,
-                {
-                    "revenue": 0.0,
-                    "transaction_count": 0,
-                    "unique_customers": set()
-                }
-            )
+            day = daily_totals[txn["Date"]]
+            day[0] += amount
+            day[1] += 1
+            day[2].add(txn["CustomerID"])
 
-            stats["revenue"] += amount
-            stats["transaction_count"] += 1
-            stats["unique_customers"].add(txn["CustomerID"])
+        return daily_totals
 
-        self._daily_data = daily_stats
-        return daily_stats
+    @cached_property
+    def _daily_trend(self):
+        """
+        Rounded per-date summary, computed once per analyzer
+        """
+        return _trend_by_date(self._daily_data)
+
+    @cached_property
+    def _peak_sales_day(self):
+        """
+        Highest-revenue date, computed once per analyzer
+        """
+        return _peak_day(self._daily_data)
 
     def daily_sales_trend(self):
         """
@@ -175,21 +126,8 @@ class SalesDateAnalyzer:
 
         Returns: dictionary sorted by date
         """
-        aggregated = self._aggregate_by_date()
-
-        return dict(
-            sorted(
-                (
-                    date,
-                    {
-                        "revenue": round(data["revenue"], 2),
-                        "transaction_count": data["transaction_count"],
-                        "unique_customers": len(data["unique_customers"])
-                    }
-                )
-                for date, data in aggregated.items()
-            )
-        )
+        # Fresh copy each call, so callers can't alter the cached summary
+        return {date: dict(data) for date, data in self._daily_trend.items()}
 
     def find_peak_sales_day(self):
         """
@@ -197,18 +135,7 @@ class SalesDateAnalyzer:
 
         Returns: tuple (date, revenue, transaction_count)
         """
-        aggregated = self._aggregate_by_date()
-
-        peak_date, peak_data = max(
-            aggregated.items(),
-            key=lambda item: item[1]["revenue"]
-        )
-
-        return (
-            peak_date,
-            round(peak_data["revenue"], 2),
-            peak_data["transaction_count"]
-        )
+        return self._peak_sales_day
 
 def low_performing_products(transactions, threshold=10):
     """
@@ -216,36 +143,201 @@ def low_performing_products(transactions, threshold=10):
 
     Returns: list of tuples
     """
+    return _low_products(_product_totals(transactions), threshold)
+
+
+# Shared aggregation helpers and combined single-pass analysis
+
+def _region_stats(region_totals, total_revenue):
+    """
+    Builds region statistics from [revenue, count] accumulators
+
+    Returns: dictionary sorted by total_sales descending
+    """
+    region_stats = {}
+
+    for region, (revenue, count) in region_totals.items():
+        revenue = round(revenue, 2)
+
+        percentage = (
+            (revenue / total_revenue) * 100
+            if total_revenue > 0 else 0.0
+        )
+
+        region_stats[region] = {
+            "total_sales": revenue,
+            "transaction_count": count,
+            "percentage": round(percentage, 2)
+        }
+
+    return dict(
+        sorted(
+            region_stats.items(),
+            key=lambda item: item[1]["total_sales"],
+            reverse=True
+        )
+    )
+
+
+def _product_totals(transactions):
+    """
+    Aggregates quantity and revenue by product in one pass
 
-    product_stats = {}
+    Returns: dictionary mapping product to [quantity, revenue]
+    """
+    product_totals = defaultdict(lambda: [0, 0.0])
 
-    # Aggregate quantity and revenue by product
     for txn in transactions:
-        product = txn["ProductName"]
         quantity = txn["Quantity"]
-        revenue = quantity * txn["UnitPrice"]
 
-        if product not in product_stats:
-            product_stats[product] = {
-                "total_quantity": 0,
-                "total_revenue": 0.0
-            }
+        amount = txn.get("TransactionAmount")  # set by validation
+        if amount is None:
+            amount = quantity * txn["UnitPrice"]
 
-        product_stats[product]["total_quantity"] += quantity
-        product_stats[product]["total_revenue"] += revenue
+        product = product_totals[txn["ProductName"]]
+        product[0] += quantity
+        product[1] += amount
 
-    # Filter products below threshold and prepare output
-    low_performers = [
-        (
-            product,
-            data["total_quantity"],
-            round(data["total_revenue"], 2)
+    return product_totals
+
+
+def _top_products(product_totals, n):
+    """
+    Selects the top n products by quantity from [quantity, revenue] totals
+
+    Returns: list of tuples (product, total_quantity, total_revenue)
+    """
+    # Keeps only n candidates instead of sorting every product,
+    # and rounds revenue for the selected products only
+    return [
+        (product, quantity, round(revenue, 2))
+        for product, (quantity, revenue) in heapq.nlargest(
+            n, product_totals.items(), key=lambda item: item[1][0]
         )
-        for product, data in product_stats.items()
-        if data["total_quantity"] < threshold
     ]
 
-    # Sort by total quantity ascending
-    low_performers.sort(key=lambda x: x[1])
 
-    return low_performers
+def _low_products(product_totals, threshold):
+    """
+    Selects products sold below threshold from [quantity, revenue] totals
+
+    Returns: list of tuples sorted by total quantity ascending
+    """
+    return sorted(
+        (
+            (product, quantity, round(revenue, 2))
+            for product, (quantity, revenue) in product_totals.items()
+            if quantity < threshold
+        ),
+        key=lambda x: x[1]
+    )
+
+
+def _trend_by_date(daily_totals):
+    """
+    Builds the daily trend from [revenue, count, customers] accumulators
+
+    Returns: dictionary sorted by date
+    """
+    return {
+        date: {
+            "revenue": round(revenue, 2),
+            "transaction_count": count,
+            "unique_customers": len(customers)
+        }
+        for date, (revenue, count, customers) in sorted(daily_totals.items())
+    }
+
+
+def _peak_day(daily_totals):
+    """
+    Finds the highest-revenue date from [revenue, count, customers]
+    accumulators
+
+    Returns: tuple (date, revenue, transaction_count)
+    """
+    peak_date, (peak_revenue, peak_count, _) = max(
+        daily_totals.items(),
+        key=lambda item: item[1][0]
+    )
+
+    return peak_date, round(peak_revenue, 2), peak_count
+
+
+def _customer_stats(customer_totals):
+    """
+    Builds customer statistics from [spent, count, products] accumulators
+
+    Returns: dictionary of customer statistics
+    """
+    customer_stats = {}
+
+    for cust, (spent, count, products) in customer_totals.items():
+        spent = round(spent, 2)
+
+        customer_stats[cust] = {
+            "total_spent": spent,
+            "purchase_count": count,
+            "products_bought": sorted(products),
+            "avg_order_value": round(spent / count, 2)
+        }
+
+    return customer_stats
+
+
+def compute_all_analytics(transactions, n=5, threshold=10):
+    """
+    Runs every sales analysis in a single pass over the transactions
+
+    Returns: dictionary with keys
+    ['total_revenue', 'region_sales', 'top_products', 'customer_stats',
+     'daily_trend', 'peak_sales_day', 'low_products']
+    """
+    total_revenue = 0.0
+    region_totals = defaultdict(lambda: [0.0, 0])           # revenue, count
+    product_totals = defaultdict(lambda: [0, 0.0])          # quantity, revenue
+    customer_totals = defaultdict(lambda: [0.0, 0, set()])  # spent, count, products
+    daily_totals = defaultdict(lambda: [0.0, 0, set()])     # revenue, count, customers
+
+    for txn in transactions:
+        quantity = txn["Quantity"]
+        product = txn["ProductName"]
+        cust = txn["CustomerID"]
+
+        amount = txn.get("TransactionAmount")  # set by validation
+        if amount is None:
+            amount = quantity * txn["UnitPrice"]
+
+        total_revenue += amount
+
+        region = region_totals[txn["Region"]]
+        region[0] += amount
+        region[1] += 1
+
+        product_stats = product_totals[product]
+        product_stats[0] += quantity
+        product_stats[1] += amount
+
+        customer = customer_totals[cust]
+        customer[0] += amount
+        customer[1] += 1
+        customer[2].add(product)
+
+        day = daily_totals[txn["Date"]]
+        day[0] += amount
+        day[1] += 1
+        day[2].add(cust)
+
+    total_revenue = round(total_revenue, 2)
+
+    daily_trend = _trend_by_date(daily_totals)
+
+    return {
+        "total_revenue": total_revenue,
+        "region_sales": _region_stats(region_totals, total_revenue),
+        "top_products": _top_products(product_totals, n),
+        "customer_stats": _customer_stats(customer_totals),
+        "daily_trend": daily_trend,
+        "peak_sales_day": _peak_day(daily_totals),
+        "low_products": _low_products(product_totals, threshold)
+    }
@@ -1,3 +1,23 @@
+import codecs
+from sys import intern
+
+SNIFF_SIZE = 4096   # bytes decoded up front to pick the file encoding
+
+
+def _decodes_prefix(prefix, encoding):
+    """
+    Checks whether the first bytes of a file decode with the given codec
+
+    A multi-byte character cut off at the end of the prefix is not an error.
+    """
+    try:
+        codecs.getincrementaldecoder(encoding)().decode(prefix)
+    except UnicodeDecodeError:
+        return False
+
+    return True
+
+
 def read_sales_data(filename):
     """
     Reads sales data from file handling encoding issues
@@ -16,29 +36,40 @@ def read_sales_data(filename):
     """
     encodings = ["utf-8", "latin-1", "cp1252"]
 
-    for encoding in encodings:
+    try:
+        with open(filename, "rb") as file:
+            prefix = file.read(SNIFF_SIZE)
+
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"Error: The file '{filename}' was not found."
+        )
+
+    # Codecs that already fail on the prefix are skipped without a full read
+    candidates = [
+        encoding for encoding in encodings
+        if _decodes_prefix(prefix, encoding)
+    ]
+
+    for encoding in candidates:
         try:
             with open(filename, "r", encoding=encoding) as file:
-                lines = file.readlines()
+                next(file, None)  # Skip header
 
-            # Skip header and remove empty lines
-            data_lines = [
-                line.strip()
-                for line in lines[1:]
-                if line.strip()
-            ]
+                # Stream the file, stripping each line once and
+                # dropping empty ones (no intermediate list of all lines)
+                data_lines = [
+                    line
+                    for line in (raw.strip() for raw in file)
+                    if line
+                ]
 
             return data_lines
 
         except UnicodeDecodeError:
-            # Try next encoding
+            # Bad byte past the sniffed prefix → try next encoding
             continue
 
-        except FileNotFoundError:
-            raise FileNotFoundError(
-                f"Error: The file '{filename}' was not found."
-            )
-
     # If all encodings fail
     raise UnicodeDecodeError(
         "read_sales_data",
@@ -48,16 +79,17 @@ def read_sales_data(filename):
         "Unable to decode file using supported encodings."
     )
 
-def parse_transactions(raw_lines):
+def iter_transactions(raw_lines):
     """
-    Parses raw lines into clean list of dictionaries
+    Lazily parses raw lines into clean dictionaries, one at a time
 
-    Returns: list of dictionaries with keys:
+    Can be passed straight to validate_transactions, which reads it in one
+    pass, so the unvalidated records are never held as a separate list.
+
+    Yields: dictionaries with keys:
     ['TransactionID', 'Date', 'ProductID', 'ProductName',
      'Quantity', 'UnitPrice', 'CustomerID', 'Region']
     """
-    parsed_records = []
-
     for line in raw_lines:
         parts = line.split("|")
 
@@ -84,31 +116,45 @@ def parse_transactions(raw_lines):
             quantity = int(quantity.replace(",", ""))
             unit_price = float(unit_price.replace(",", ""))
 
+            # Low-cardinality columns are interned so repeated values share
+            # one string object and hash/compare cheaply in the analyses
             record = {
                 "TransactionID": transaction_id.strip(),
-                "Date": date.strip(),
-                "ProductID": product_id.strip(),
-                "ProductName": product_name,
+                "Date": intern(date.strip()),
+                "ProductID": intern(product_id.strip()),
+                "ProductName": intern(product_name),
                 "Quantity": quantity,
                 "UnitPrice": unit_price,
-                "CustomerID": customer_id.strip(),
-                "Region": region.strip()
+                "CustomerID": intern(customer_id.strip()),
+                "Region": intern(region.strip())
             }
 
-            parsed_records.append(record)
-
         except ValueError:
             # Skip records with unconvertible numeric values
             continue
 
-    return parsed_records
+        yield record
 
 
-def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None):
+def parse_transactions(raw_lines):
     """
-    Validates transactions and applies optional filters
+    Parses raw lines into clean list of dictionaries
+
+    Returns: list of dictionaries with keys:
+    ['TransactionID', 'Date', 'ProductID', 'ProductName',
+     'Quantity', 'UnitPrice', 'CustomerID', 'Region']
+    """
+    return list(iter_transactions(raw_lines))
+
+
+def validate_transactions(transactions):
+    """
+    Validates transactions and attaches TransactionAmount to valid records
+
+    Returns: tuple (valid_transactions, invalid_count, validation_info)
+    where validation_info holds 'available_regions' (sorted list) and
+    'amount_range' ((min, max) tuple, or None if nothing is valid)
     """
-    total_input = len(transactions)
     invalid_count = 0
     valid_transactions = []
 
@@ -117,80 +163,117 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
         "Quantity", "UnitPrice", "CustomerID", "Region"
     }
 
-    # Collect region and amount info for display
+    # Collect region and amount info for the caller to display
     available_regions = set()
-    amounts = []
-    region_valid_transactions = []
+    lowest_amount = None
+    highest_amount = None
 
     for txn in transactions:
-        # Check required fields
-        if not required_fields.issubset(txn.keys()):
-            invalid_count += 1
-            continue
-
-        # Validate ID formats
+        # Required fields, ID prefixes, positive numerics and a non-blank
+        # region, short-circuiting on the first failed check (prefixes are
+        # compared as one-character slices, avoiding method calls)
         if not (
-            txn["TransactionID"].startswith("T")
-            and txn["ProductID"].startswith("P")
-            and txn["CustomerID"].startswith("C")
+            required_fields <= txn.keys()
+            and txn["TransactionID"][:1] == "T"
+            and txn["ProductID"][:1] == "P"
+            and txn["CustomerID"][:1] == "C"
+            and not (txn["Quantity"] <= 0 or txn["UnitPrice"] <= 0)
+            and str(txn["Region"]).strip()
         ):
             invalid_count += 1
             continue
 
-        # Validate numeric fields
-        if txn["Quantity"] <= 0 or txn["UnitPrice"] <= 0:
-            invalid_count += 1
-            continue
-
-        if not str(txn["Region"]).strip():
-            invalid_count += 1
-            continue
-
         amount = txn["Quantity"] * txn["UnitPrice"]
 
         available_regions.add(txn["Region"])
-        amounts.append(amount)
+
+        # Track the amount range as we go instead of keeping every amount
+        if lowest_amount is None or amount < lowest_amount:
+            lowest_amount = amount
+        if highest_amount is None or amount > highest_amount:
+            highest_amount = amount
 
         txn["TransactionAmount"] = amount
         valid_transactions.append(txn)
 
-    # Display available regions and amount range
-    if available_regions:
-        print(f"Available Regions: {sorted(available_regions)}")
+    validation_info = {
+        "available_regions": sorted(available_regions),
+        "amount_range": (
+            (lowest_amount, highest_amount)
+            if lowest_amount is not None else None
+        )
+    }
 
-    if amounts:
-        print(f"Transaction Amount Range: {min(amounts)} to {max(amounts)}")
+    return valid_transactions, invalid_count, validation_info
 
-    # Apply region filter
-    filtered_by_region = 0
+
+def apply_filters(valid_transactions, region=None, min_amount=None, max_amount=None):
+    """
+    Applies optional region and amount filters to validated transactions
+
+    Returns: tuple (filtered_transactions, filter_counts)
+    """
+    # Each stage picks its comprehension once from the active filters,
+    # so no per-row checks are spent on filters that are not set
     if region:
-        region_valid_transactions = [
+        region_transactions = [
             txn for txn in valid_transactions
             if txn["Region"] == region
         ]
     else:
-        region_valid_transactions = valid_transactions.copy()
-    filtered_by_region = len(region_valid_transactions)
-
-    # Apply amount filter
-    filtered_by_amount = 0
-    if min_amount is not None or max_amount is not None:
-        region_valid_transactions = [
-            txn for txn in region_valid_transactions
-            if (
-                (min_amount is None or txn["TransactionAmount"] >= min_amount)
-                and (max_amount is None or txn["TransactionAmount"] <= max_amount)
-            )
+        region_transactions = valid_transactions
+
+    if min_amount is not None and max_amount is not None:
+        filtered_transactions = [
+            txn for txn in region_transactions
+            if min_amount <= txn["TransactionAmount"] <= max_amount
+        ]
+    elif min_amount is not None:
+        filtered_transactions = [
+            txn for txn in region_transactions
+            if txn["TransactionAmount"] >= min_amount
         ]
-    filtered_by_amount = len(region_valid_transactions)
+    elif max_amount is not None:
+        filtered_transactions = [
+            txn for txn in region_transactions
+            if txn["TransactionAmount"] <= max_amount
+        ]
+    else:
+        filtered_transactions = list(region_transactions)
 
-    filter_summary = {
-        "total_input": total_input,
-        "invalid": invalid_count,
+    filtered_by_region = len(region_transactions)
+    filtered_by_amount = len(filtered_transactions)
+
+    filter_counts = {
         "filtered_by_region": filtered_by_region,
         "filtered_by_amount": filtered_by_amount,
-        "final_count": len(region_valid_transactions)
+        "final_count": len(filtered_transactions)
+    }
+
+    return filtered_transactions, filter_counts
+
+
+def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None):
+    """
+    Validates transactions and applies optional filters
+    """
+    valid_transactions, invalid_count, validation_info = validate_transactions(
+        transactions
+    )
+
+    filtered_transactions, filter_counts = apply_filters(
+        valid_transactions,
+        region=region,
+        min_amount=min_amount,
+        max_amount=max_amount
+    )
+
+    filter_summary = {
+        "total_input": len(transactions),
+        "invalid": invalid_count,
+        **filter_counts,
+        **validation_info
     }
 
-    return region_valid_transactions, invalid_count, filter_summary
+    return filtered_transactions, invalid_count, filter_summary
 